@@ -1,10 +1,10 @@
 from django.contrib import admin
-from .models import Product, Customer, Purchase, PurchaseItem, Denomination, BalanceDenomination
+from .models import Product, Customer, Purchase, PurchaseItem, Denomination
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ['product_id', 'name', 'available_stocks', 'price_per_unit', 'tax_percentage']
-    list_filter = ['tax_percentage', 'created_at']
+    list_display = ['product_id', 'name', 'store', 'available_stocks', 'price_per_unit', 'tax_percentage']
+    list_filter = ['store', 'tax_percentage', 'created_at']
     search_fields = ['product_id', 'name']
 
 @admin.register(Customer)
@@ -17,19 +17,15 @@ class PurchaseItemInline(admin.TabularInline):
     extra = 0
     readonly_fields = ['tax_amount', 'total_price']
 
-class BalanceDenominationInline(admin.TabularInline):
-    model = BalanceDenomination
-    extra = 0
-
 @admin.register(Purchase)
 class PurchaseAdmin(admin.ModelAdmin):
-    list_display = ['purchase_id', 'customer', 'net_amount', 'created_at']
-    list_filter = ['created_at']
+    list_display = ['purchase_id', 'store', 'customer', 'net_amount', 'created_at']
+    list_filter = ['store', 'created_at']
     search_fields = ['purchase_id', 'customer__email']
-    readonly_fields = ['purchase_id', 'created_at']
-    inlines = [PurchaseItemInline, BalanceDenominationInline]
+    readonly_fields = ['purchase_id', 'balance_denomination_counts', 'created_at']
+    inlines = [PurchaseItemInline]
 
 @admin.register(Denomination)
 class DenominationAdmin(admin.ModelAdmin):
-    list_display = ['value', 'count']
+    list_display = ['value', 'store', 'count']
     ordering = ['-value']
\ No newline at end of file
@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.core.cache import cache
+from .pricing import bill_totals, price_cart
+import uuid
+
+class CartError(Exception):
+    """A cart change that cannot be applied; the message is shown to the cashier"""
+
+def cart_ttl():
+    return getattr(settings, 'BILLING_CART_TTL', 4 * 60 * 60)
+
+def _cache_key(store, cart_id):
+    return f'billing:cart:{store}:{cart_id}'
+
+def create_cart(store):
+    """Start an empty cart for ``store`` and save it"""
+    cart = {
+        'cart_id': str(uuid.uuid4()),
+        'store': store,
+        'lines': {}
+    }
+    save_cart(cart)
+    return cart
+
+def get_cart(store, cart_id):
+    return cache.get(_cache_key(store, cart_id))
+
+def save_cart(cart):
+    cache.set(_cache_key(cart['store'], cart['cart_id']), cart, cart_ttl())
+
+def delete_cart(cart):
+    cache.delete(_cache_key(cart['store'], cart['cart_id']))
+
+def claim_checkout(cart):
+    """Atomically claim the cart for checkout; False if another request already has it.
+
+    The claim is only released when checkout fails, so a retried or concurrent
+    request for a cart that was paid for cannot record a second purchase.
+    """
+    return cache.add(_cache_key(cart['store'], cart['cart_id']) + ':checkout', 1, cart_ttl())
+
+def release_checkout(cart):
+    cache.delete(_cache_key(cart['store'], cart['cart_id']) + ':checkout')
+
+def set_line_quantity(cart, product, quantity):
+    """Set the quantity of ``product`` in the cart (0 removes the line).
+
+    Only this line is fetched, stock-checked and priced; the other lines keep
+    the amounts they were priced with.
+    """
+    if quantity < 0:
+        raise CartError(f'Quantity must be greater than 0 for {product.name}')
+
+    if quantity > product.available_stocks:
+        raise CartError(f'Insufficient stock for {product.name}. Available: {product.available_stocks}')
+
+    if quantity == 0:
+        cart['lines'].pop(product.product_id, None)
+    else:
+        [priced], _ = price_cart([{
+            'unit_price': product.price_per_unit,
+            'quantity': quantity,
+            'tax_percentage': product.tax_percentage
+        }])
+        cart['lines'][product.product_id] = {
+            'product_pk': product.pk,
+            'product_id': product.product_id,
+            'name': product.name,
+            'quantity': quantity,
+            'unit_price': product.price_per_unit,
+            'tax_percentage': product.tax_percentage,
+            **priced
+        }
+
+def line_quantity(cart, product_id):
+    line = cart['lines'].get(product_id)
+    return line['quantity'] if line else 0
+
+def cart_items(cart):
+    """Cart lines in the shape ``complete_checkout`` expects"""
+    return list(cart['lines'].values())
+
+def cart_totals(cart):
+    """Running totals summed left to right over the stored line amounts.
+
+    This is the same sum ``price_cart`` does at checkout, so the total shown to
+    the cashier is exactly the one charged.
+    """
+    lines = cart['lines'].values()
+    return bill_totals(sum(line['line_total'] for line in lines), sum(line['tax_amount'] for line in lines))
+
+def cart_payload(cart):
+    return {
+        'cart_id': cart['cart_id'],
+        'store': cart['store'],
+        'lines': [
+            {key: value for key, value in line.items() if key != 'product_pk'}
+            for line in cart['lines'].values()
+        ],
+        'totals': cart_totals(cart)
+    }
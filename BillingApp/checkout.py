@@ -0,0 +1,107 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Product, Customer, Purchase, PurchaseItem, ProductChange
+from .pricing import price_cart
+from .sharding import db_for_store, use_store
+from .utils import calculate_balance_denominations, update_denomination_stock, send_invoice_email
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CheckoutError(Exception):
+    """A checkout that cannot go through; the message is shown to the cashier"""
+
+def complete_checkout(store, customer_email, items, cash_paid, denominations_received):
+    """Charge already validated items and record the purchase.
+
+    Each item holds 'product_pk', 'name', 'quantity', 'unit_price' and
+    'tax_percentage'. Stock is taken with a conditional update, so a line that
+    another checkout sold out in the meantime rolls the whole purchase back.
+    Every query runs against ``store``'s shard, whatever store is active.
+    """
+    with use_store(store):
+        return _complete_checkout(store, customer_email, items, cash_paid, denominations_received)
+
+def _complete_checkout(store, customer_email, items, cash_paid, denominations_received):
+    # Price every line and the bill totals in one pass
+    priced_lines, totals = price_cart(items)
+    balance_amount = cash_paid - totals['rounded_amount']
+
+    if balance_amount < 0:
+        raise CheckoutError('Insufficient payment')
+
+    # Calculate balance denominations only if there's a balance
+    balance_denominations = {}
+    if balance_amount > 0:
+        balance_denominations, remaining = calculate_balance_denominations(balance_amount)
+
+        if remaining > 0:
+            raise CheckoutError(f'Cannot provide exact change. Short by ₹{remaining}')
+
+    with transaction.atomic(using=db_for_store(store)):
+        # Check if customer already exists by email (case-insensitive match)
+        customer = Customer.objects.filter(email__iexact=customer_email).first()
+
+        if not customer:
+            customer = Customer.objects.create(email=customer_email)
+
+        purchase = Purchase.objects.create(
+            store=store,
+            customer=customer,
+            total_amount=totals['total_without_tax'],
+            tax_amount=totals['total_tax'],
+            net_amount=totals['net_amount'],
+            rounded_amount=totals['rounded_amount'],
+            cash_paid=cash_paid,
+            balance_amount=balance_amount,
+            balance_denomination_counts={
+                str(value): count for value, count in balance_denominations.items() if count > 0
+            }
+        )
+
+        PurchaseItem.objects.bulk_create([
+            PurchaseItem(
+                purchase=purchase,
+                product_id=item['product_pk'],
+                quantity=item['quantity'],
+                unit_price=item['unit_price'],
+                tax_percentage=item['tax_percentage'],
+                tax_amount=priced['tax_amount'],
+                total_price=priced['total_price']
+            )
+            for item, priced in zip(items, priced_lines)
+        ])
+
+        # Take stock only if it is still there, even if another till sold some since validation
+        now = timezone.now()
+        for item in items:
+            taken = Product.objects.filter(
+                pk=item['product_pk'], available_stocks__gte=item['quantity']
+            ).update(available_stocks=F('available_stocks') - item['quantity'], updated_at=now)
+            if not taken:
+                if not Product.objects.filter(pk=item['product_pk']).exists():
+                    raise CheckoutError(f"{item['name']} is no longer in the catalog")
+                raise CheckoutError(f"Insufficient stock for {item['name']}")
+
+        # update() skips post_save, so feed the catalog change log here
+        ProductChange.objects.bulk_create([
+            ProductChange.for_product(product)
+            for product in Product.objects.filter(pk__in=[item['product_pk'] for item in items])
+        ])
+
+        # Update denomination stock only if change was given
+        if balance_denominations:
+            received_denominations = {
+                int(k): int(v) for k, v in denominations_received.items()
+                if int(v) > 0
+            }
+            update_denomination_stock(balance_denominations, received_denominations)
+
+        # Send invoice email (asynchronously in production)
+        try:
+            send_invoice_email(purchase)
+        except Exception as e:
+            logger.warning(f"Failed to send email for purchase {purchase.purchase_id}: {str(e)}")
+
+    return purchase
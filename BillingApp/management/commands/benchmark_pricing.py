@@ -0,0 +1,49 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from BillingApp import pricing
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the Python and NumPy line-item pricing paths across cart sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                            help='Cart sizes (number of lines) to benchmark')
+        parser.add_argument('--repeat', type=int, default=5, help='Timing repeats per size; the best is reported')
+
+    def handle(self, *args, **options):
+        if pricing.np is None:
+            raise CommandError('NumPy is not installed; only the Python pricing path is available')
+
+        rng = random.Random(0)
+        self.stdout.write(f"BILLING_PRICING_VECTORIZE_THRESHOLD: {pricing.vectorize_threshold()}")
+        self.stdout.write(f"{'lines':>8} {'python (ms)':>12} {'numpy (ms)':>12} {'speedup':>8}")
+
+        for size in options['sizes']:
+            items_data = [
+                {
+                    'unit_price': round(rng.uniform(1, 5000), 2),
+                    'quantity': rng.randint(1, 10),
+                    'tax_percentage': rng.choice([0.0, 5.0, 12.0, 18.0, 28.0])
+                }
+                for _ in range(size)
+            ]
+
+            python_path = self.best_of(lambda: pricing.price_cart(items_data, vectorize=False), options['repeat'])
+            numpy_path = self.best_of(lambda: pricing.price_cart(items_data, vectorize=True), options['repeat'])
+
+            if pricing.price_cart(items_data, vectorize=False) != pricing.price_cart(items_data, vectorize=True):
+                raise CommandError(f'Pricing paths disagree for a {size}-line cart')
+
+            self.stdout.write(
+                f'{size:>8} {python_path * 1000:>12.3f} {numpy_path * 1000:>12.3f} '
+                f'{python_path / numpy_path:>7.2f}x'
+            )
+
+    def best_of(self, func, repeat):
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat=repeat, number=number)) / number
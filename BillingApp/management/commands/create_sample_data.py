@@ -1,10 +1,21 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from BillingApp.models import Product, Denomination
+from BillingApp.sharding import default_store, store_shards, use_store
 
 class Command(BaseCommand):
     help = 'Create sample data for the billing system'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--store', default='', help='Store to seed (defaults to BILLING_DEFAULT_STORE)')
+
     def handle(self, *args, **options):
+        store = options['store'] or default_store()
+        if store not in store_shards():
+            raise CommandError(f'Unknown store {store}')
+        with use_store(store):
+            self.create_sample_data(store)
+
+    def create_sample_data(self, store):
         # Create sample products
         products_data = [
             {'product_id': 'PROD001', 'name': 'Laptop', 'available_stocks': 50, 'price_per_unit': 50000.0, 'tax_percentage': 18.0},
@@ -16,6 +27,7 @@ class Command(BaseCommand):
         
         for product_data in products_data:
             product, created = Product.objects.get_or_create(
+                store=store,
                 product_id=product_data['product_id'],
                 defaults=product_data
             )
@@ -28,6 +40,7 @@ class Command(BaseCommand):
         denominations = [500, 50, 20, 10, 5, 2, 1]
         for value in denominations:
             denom, created = Denomination.objects.get_or_create(
+                store=store,
                 value=value,
                 defaults={'count': 50}  # Start with 50 of each
             )
@@ -36,4 +49,4 @@ class Command(BaseCommand):
             else:
                 self.stdout.write(f'⚠️  Denomination already exists: ₹{value}')
         
-        self.stdout.write(self.style.SUCCESS('🎉 Sample data creation completed!'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f'🎉 Sample data creation completed for store {store}!'))
\ No newline at end of file
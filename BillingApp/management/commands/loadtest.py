@@ -0,0 +1,257 @@
+import io
+import json
+import logging
+import math
+import os
+import random
+import tempfile
+import time
+import http.cookiejar
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.contrib.staticfiles.handlers import StaticFilesHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Sum
+from django.test.testcases import LiveServerThread
+from django.urls import reverse
+
+from BillingApp.models import Product, Denomination, Purchase, PurchaseItem
+
+CASH_STEPS = [0, 10, 50, 100, 500]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def build_cart(catalog, rng, max_lines):
+    """Pick a random cart and the cash a customer would hand over for it"""
+    lines = rng.sample(catalog, min(len(catalog), rng.randint(1, max_lines)))
+    cart = [(product, rng.randint(1, 3)) for product in lines]
+
+    net_amount = 0
+    for product, quantity in cart:
+        item_total = product['price'] * quantity
+        net_amount += item_total + (item_total * product['tax_percentage']) / 100
+    rounded_amount = math.ceil(net_amount)
+
+    # Most customers pay exact or round up to a convenient note
+    step = rng.choice(CASH_STEPS)
+    cash_paid = rounded_amount if step == 0 else math.ceil(rounded_amount / step) * step
+    return cart, cash_paid
+
+
+def run_cashier(base_url, checkout_path, catalog, checkouts, max_lines, seed):
+    """Simulate one cashier ringing up ``checkouts`` bills over HTTP.
+
+    Module-level so it can run in a process pool as well as a thread pool.
+    """
+    rng = random.Random(seed)
+    cookies = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies))
+    checkout_url = base_url + checkout_path
+
+    # Load the billing page once to pick up the CSRF cookie
+    opener.open(checkout_url).read()
+    csrf_token = next((c.value for c in cookies if c.name == 'csrftoken'), '')
+
+    results = []
+    for number in range(checkouts):
+        cart, cash_paid = build_cart(catalog, rng, max_lines)
+        fields = [
+            ('customer_email', f'cashier{seed}-{number}@loadtest.local'),
+            ('cash_paid', str(cash_paid)),
+        ]
+        for product, quantity in cart:
+            fields.append(('product_id[]', product['product_id']))
+            fields.append(('quantity[]', str(quantity)))
+
+        request = urllib.request.Request(
+            checkout_url,
+            data=urllib.parse.urlencode(fields).encode(),
+            headers={'X-CSRFToken': csrf_token},
+        )
+        started = time.perf_counter()
+        try:
+            with opener.open(request) as response:
+                status = response.status
+                body = response.read()
+        except urllib.error.HTTPError as e:
+            status = e.code
+            body = e.read()
+        except OSError as e:
+            status = 0
+            body = str(e).encode()
+        elapsed = time.perf_counter() - started
+
+        try:
+            error = json.loads(body).get('error', '')
+        except ValueError:
+            error = body.decode(errors='replace')[:200] if status != 200 else ''
+        results.append({'status': status, 'latency': elapsed, 'error': error})
+
+    return results
+
+
+class Command(BaseCommand):
+    help = 'Run simulated cashiers concurrently against a live server and check stock/drawer invariants'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cashiers', type=int, default=8, help='Number of concurrent cashiers')
+        parser.add_argument('--checkouts', type=int, default=25, help='Checkouts per cashier')
+        parser.add_argument('--max-lines', type=int, default=5, help='Maximum distinct products per cart')
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread',
+                            help='Run cashiers in a thread pool or a process pool')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for carts and cash')
+        parser.add_argument('--url', default='',
+                            help='Base URL of an already running server that shares this database. '
+                                 'If omitted, a throwaway database and live server are started.')
+
+    def handle(self, *args, **options):
+        if options['cashiers'] <= 0 or options['checkouts'] <= 0:
+            raise CommandError('--cashiers and --checkouts must be greater than 0')
+
+        if options['url']:
+            self.run_load(options['url'].rstrip('/'), options)
+            return
+
+        # Run against a file-backed test database so every server thread
+        # gets its own connection, exactly like a real deployment.
+        old_name = connection.settings_dict['NAME']
+        test_dir = tempfile.TemporaryDirectory()
+        test_file = os.path.join(test_dir.name, 'loadtest.sqlite3')
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = test_file
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        # Keep invoice emails and per-request error logs from drowning the report;
+        # failures are tallied from the responses instead.
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.dummy.EmailBackend'
+        for name in ('django.request', 'BillingApp'):
+            logging.getLogger(name).setLevel(logging.CRITICAL)
+
+        server = None
+        try:
+            call_command('create_sample_data', stdout=io.StringIO())
+            server = LiveServerThread('localhost', StaticFilesHandler)
+            server.daemon = True
+            server.start()
+            server.is_ready.wait()
+            if server.error:
+                raise CommandError(f'Live server failed to start: {server.error}')
+            self.run_load(f'http://localhost:{server.port}', options)
+        finally:
+            if server is not None:
+                server.terminate()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_dir.cleanup()
+
+    def snapshot(self):
+        return {
+            'stock': dict(Product.objects.values_list('product_id', 'available_stocks')),
+            'drawer': dict(Denomination.objects.values_list('value', 'count')),
+            'last_purchase': Purchase.objects.aggregate(last=Max('id'))['last'] or 0,
+        }
+
+    def run_load(self, base_url, options):
+        catalog = [
+            {'product_id': p.product_id, 'price': p.price_per_unit, 'tax_percentage': p.tax_percentage}
+            for p in Product.objects.all()
+        ]
+        if not catalog:
+            raise CommandError('No products to sell. Run create_sample_data first.')
+
+        before = self.snapshot()
+        connection.close()
+
+        executor_class = ThreadPoolExecutor if options['pool'] == 'thread' else ProcessPoolExecutor
+        checkout_path = reverse('BillingApp:billing_form')
+        self.stdout.write(
+            f"Running {options['cashiers']} cashiers x {options['checkouts']} checkouts "
+            f"({options['pool']} pool) against {base_url}"
+        )
+
+        results = []
+        started = time.perf_counter()
+        with executor_class(max_workers=options['cashiers']) as executor:
+            futures = [
+                executor.submit(run_cashier, base_url, checkout_path, catalog,
+                                options['checkouts'], options['max_lines'], options['seed'] + n)
+                for n in range(options['cashiers'])
+            ]
+            for future in as_completed(futures):
+                results.extend(future.result())
+        wall_time = time.perf_counter() - started
+
+        self.report(results, wall_time)
+        self.check_invariants(before, self.snapshot(), results)
+
+    def report(self, results, wall_time):
+        latencies = [r['latency'] * 1000 for r in results]
+        succeeded = [r for r in results if r['status'] == 200]
+        rejected = [r for r in results if 400 <= r['status'] < 500]
+        failed = [r for r in results if r['status'] == 0 or r['status'] >= 500]
+        total = len(results)
+
+        self.stdout.write(f'Requests:     {total} in {wall_time:.2f}s')
+        self.stdout.write(f'Throughput:   {len(succeeded) / wall_time:.1f} checkouts/s '
+                          f'({total / wall_time:.1f} requests/s)')
+        self.stdout.write(f'Latency (ms): p50={percentile(latencies, 50):.1f} '
+                          f'p95={percentile(latencies, 95):.1f} p99={percentile(latencies, 99):.1f} '
+                          f'max={max(latencies):.1f}')
+        self.stdout.write(f'Succeeded:    {len(succeeded)} ({len(succeeded) / total:.1%})')
+        self.stdout.write(f'Rejected:     {len(rejected)} ({len(rejected) / total:.1%})')
+        self.stdout.write(f'Failed:       {len(failed)} ({len(failed) / total:.1%})')
+
+        locked = sum(1 for r in failed if 'database is locked' in r['error'])
+        if locked:
+            self.stdout.write(self.style.WARNING(f'  "database is locked": {locked}'))
+        for error, count in Counter(r['error'] for r in rejected + failed).most_common(5):
+            self.stdout.write(f'  {count:>5}  {error}')
+
+    def check_invariants(self, before, after, results):
+        """Stock and drawer movements must match the purchases that were recorded"""
+        purchases = Purchase.objects.filter(id__gt=before['last_purchase'])
+        sold = dict(
+            PurchaseItem.objects.filter(purchase__in=purchases)
+            .values_list('product__product_id')
+            .annotate(total=Sum('quantity'))
+        )
+        given = Counter()
+        for counts in purchases.values_list('balance_denomination_counts', flat=True):
+            given.update({int(value): count for value, count in counts.items()})
+
+        problems = []
+        recorded = purchases.count()
+        succeeded = sum(1 for r in results if r['status'] == 200)
+        if recorded != succeeded:
+            problems.append(f'{recorded} purchases recorded but {succeeded} checkouts succeeded')
+
+        for product_id, stock in before['stock'].items():
+            moved = stock - after['stock'].get(product_id, 0)
+            if moved != sold.get(product_id, 0):
+                problems.append(f'Product {product_id}: stock fell by {moved}, '
+                                f'purchases record {sold.get(product_id, 0)} sold')
+
+        for value, count in before['drawer'].items():
+            moved = count - after['drawer'].get(value, 0)
+            if moved != given.get(value, 0):
+                problems.append(f'Denomination ₹{value}: drawer fell by {moved}, '
+                                f'purchases record {given.get(value, 0)} given as change')
+
+        if problems:
+            for problem in problems:
+                self.stdout.write(f'  {problem}')
+            raise CommandError(f'Invariant check failed ({len(problems)} problems)')
+        self.stdout.write(self.style.SUCCESS('Invariant check passed: stock and drawer match recorded purchases'))
@@ -0,0 +1,77 @@
+import io
+import json
+import pstats
+from collections import defaultdict
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from BillingApp.profiling import profiling_settings
+
+
+class Command(BaseCommand):
+    help = 'Summarize the hottest functions and SQL queries across saved slow-request profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default='', help='Capture directory (defaults to BILLING_PROFILING_DIR)')
+        parser.add_argument('--limit', type=int, default=15, help='Number of functions and queries to show')
+        parser.add_argument('--sort', choices=['cumulative', 'tottime', 'ncalls'], default='cumulative',
+                            help='Sort order for the function table')
+
+    def handle(self, *args, **options):
+        directory = Path(options['dir']) if options['dir'] else profiling_settings()['directory']
+        captures = sorted(directory.glob('*.json')) if directory.is_dir() else []
+        if not captures:
+            raise CommandError(f'No captures found in {directory}')
+
+        requests = []
+        for path in captures:
+            with open(path) as f:
+                requests.append(json.load(f))
+
+        durations = sorted(r['duration_ms'] for r in requests)
+        self.stdout.write(f'{len(requests)} captures in {directory}')
+        self.stdout.write(f'Duration (ms): min={durations[0]:.0f} '
+                          f'median={durations[len(durations) // 2]:.0f} max={durations[-1]:.0f}')
+
+        by_path = defaultdict(list)
+        for r in requests:
+            by_path[f"{r['method']} {r['path']}"].append(r['duration_ms'])
+        self.stdout.write('\nSlow requests by path:')
+        for path, times in sorted(by_path.items(), key=lambda kv: -sum(kv[1])):
+            self.stdout.write(f'  {len(times):>5}  avg {sum(times) / len(times):>8.0f}ms  {path}')
+
+        self.report_functions(directory, requests, options)
+        self.report_queries(requests, options['limit'])
+
+    def report_functions(self, directory, requests, options):
+        profiles = [directory / r['profile'] for r in requests if r.get('profile')]
+        profiles = [p for p in profiles if p.exists()]
+        if not profiles:
+            return
+
+        out = io.StringIO()
+        stats = pstats.Stats(str(profiles[0]), stream=out)
+        for profile in profiles[1:]:
+            stats.add(str(profile))
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(options['limit'])
+
+        self.stdout.write(f'\nHot functions across {len(profiles)} profiles (by {options["sort"]}):')
+        self.stdout.write(out.getvalue().strip())
+
+    def report_queries(self, requests, limit):
+        totals = defaultdict(lambda: {'count': 0, 'duration_ms': 0.0})
+        for r in requests:
+            for query in r['queries']:
+                entry = totals[query['sql']]
+                entry['count'] += 1
+                entry['duration_ms'] += query['duration_ms']
+        if not totals:
+            return
+
+        self.stdout.write(f'\nTop {limit} queries by total time:')
+        self.stdout.write(f"{'total ms':>10} {'calls':>7} {'avg ms':>8}  sql")
+        ranked = sorted(totals.items(), key=lambda kv: -kv[1]['duration_ms'])
+        for sql, entry in ranked[:limit]:
+            self.stdout.write(f"{entry['duration_ms']:>10.1f} {entry['count']:>7} "
+                              f"{entry['duration_ms'] / entry['count']:>8.2f}  {sql[:200]}")
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:34
+
+from django.db import migrations, models
+
+
+def seed_change_feed(apps, schema_editor):
+    """Start the feed with one entry per existing product"""
+    Product = apps.get_model('BillingApp', 'Product')
+    ProductChange = apps.get_model('BillingApp', 'ProductChange')
+    db_alias = schema_editor.connection.alias
+    ProductChange.objects.using(db_alias).bulk_create([
+        ProductChange(
+            product_id=product.product_id,
+            name=product.name,
+            available_stocks=product.available_stocks,
+            price_per_unit=product.price_per_unit,
+            tax_percentage=product.tax_percentage
+        )
+        for product in Product.objects.using(db_alias).order_by('id')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BillingApp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.CharField(db_index=True, max_length=50)),
+                ('name', models.CharField(max_length=200)),
+                ('available_stocks', models.PositiveIntegerField(default=0)),
+                ('price_per_unit', models.FloatField(default=0.0)),
+                ('tax_percentage', models.FloatField(default=0.0)),
+                ('deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(seed_change_feed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:35
+
+from django.db import migrations, models
+
+
+def fold_balance_denominations(apps, schema_editor):
+    """Pack each purchase's BalanceDenomination rows into balance_denomination_counts"""
+    Purchase = apps.get_model('BillingApp', 'Purchase')
+    BalanceDenomination = apps.get_model('BillingApp', 'BalanceDenomination')
+    db_alias = schema_editor.connection.alias
+
+    counts_by_purchase = {}
+    for purchase_pk, value, count in BalanceDenomination.objects.using(db_alias).values_list('purchase_id', 'denomination_value', 'count'):
+        if count > 0:
+            counts = counts_by_purchase.setdefault(purchase_pk, {})
+            counts[str(value)] = counts.get(str(value), 0) + count
+
+    purchases = list(Purchase.objects.using(db_alias).filter(pk__in=counts_by_purchase))
+    for purchase in purchases:
+        purchase.balance_denomination_counts = counts_by_purchase[purchase.pk]
+    Purchase.objects.using(db_alias).bulk_update(purchases, ['balance_denomination_counts'], batch_size=500)
+
+
+def unfold_balance_denominations(apps, schema_editor):
+    Purchase = apps.get_model('BillingApp', 'Purchase')
+    BalanceDenomination = apps.get_model('BillingApp', 'BalanceDenomination')
+    db_alias = schema_editor.connection.alias
+
+    BalanceDenomination.objects.using(db_alias).bulk_create([
+        BalanceDenomination(purchase_id=purchase_pk, denomination_value=int(value), count=count)
+        for purchase_pk, counts in Purchase.objects.using(db_alias).exclude(balance_denomination_counts={})
+        .values_list('pk', 'balance_denomination_counts')
+        for value, count in counts.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BillingApp', '0002_productchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='balance_denomination_counts',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(fold_balance_denominations, unfold_balance_denominations),
+        migrations.DeleteModel(
+            name='BalanceDenomination',
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-19 00:37
+
+import BillingApp.sharding
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('BillingApp', '0003_compact_balance_denominations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='denomination',
+            name='store',
+            field=models.CharField(db_index=True, default=BillingApp.sharding.current_store, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='store',
+            field=models.CharField(db_index=True, default=BillingApp.sharding.current_store, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='productchange',
+            name='store',
+            field=models.CharField(db_index=True, default=BillingApp.sharding.current_store, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='purchase',
+            name='store',
+            field=models.CharField(db_index=True, default=BillingApp.sharding.current_store, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='denomination',
+            name='value',
+            field=models.IntegerField(),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='product_id',
+            field=models.CharField(max_length=50),
+        ),
+        migrations.AddConstraint(
+            model_name='denomination',
+            constraint=models.UniqueConstraint(fields=('store', 'value'), name='unique_denomination_per_store'),
+        ),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('store', 'product_id'), name='unique_product_per_store'),
+        ),
+    ]
@@ -1,9 +1,11 @@
 from django.db import models
 from django.core.validators import MinValueValidator
 import uuid
+from .sharding import current_store
 
 class Product(models.Model):
-    product_id = models.CharField(max_length=50, unique=True)
+    store = models.CharField(max_length=20, default=current_store, db_index=True)
+    product_id = models.CharField(max_length=50)
     name = models.CharField(max_length=200)
     available_stocks = models.PositiveIntegerField(default=0)
     price_per_unit = models.FloatField(validators=[MinValueValidator(0.0)])
@@ -16,6 +18,9 @@ class Product(models.Model):
 
     class Meta:
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['store', 'product_id'], name='unique_product_per_store')
+        ]
 
 class Customer(models.Model):
     email = models.EmailField(unique=True)
@@ -25,6 +30,7 @@ class Customer(models.Model):
         return self.email
 
 class Purchase(models.Model):
+    store = models.CharField(max_length=20, default=current_store, db_index=True)
     purchase_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
     total_amount = models.FloatField(default=0.0)
@@ -33,11 +39,22 @@ class Purchase(models.Model):
     rounded_amount = models.FloatField(default=0.0)
     cash_paid = models.FloatField(default=0.0)
     balance_amount = models.FloatField(default=0.0)
+    # Notes/coins handed back as change, packed as {"<value>": count}
+    balance_denomination_counts = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"Purchase {self.purchase_id} - {self.customer.email}"
 
+    @property
+    def balance_denominations(self):
+        """Balance denominations as rows for the receipt, largest value first"""
+        counts = sorted(
+            ((int(value), count) for value, count in self.balance_denomination_counts.items()),
+            reverse=True
+        )
+        return [{'denomination_value': value, 'count': count} for value, count in counts if count > 0]
+
     class Meta:
         ordering = ['-created_at']
 
@@ -54,7 +71,8 @@ class PurchaseItem(models.Model):
         return f"{self.product.name} x {self.quantity}"
 
 class Denomination(models.Model):
-    value = models.IntegerField(unique=True)
+    store = models.CharField(max_length=20, default=current_store, db_index=True)
+    value = models.IntegerField()
     count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
@@ -62,11 +80,45 @@ class Denomination(models.Model):
 
     class Meta:
         ordering = ['-value']
+        constraints = [
+            models.UniqueConstraint(fields=['store', 'value'], name='unique_denomination_per_store')
+        ]
 
-class BalanceDenomination(models.Model):
-    purchase = models.ForeignKey(Purchase, on_delete=models.CASCADE, related_name='balance_denominations')
-    denomination_value = models.IntegerField()
-    count = models.PositiveIntegerField()
+class ProductChange(models.Model):
+    """One entry in the catalog change feed; ``id`` is the feed sequence number"""
+    store = models.CharField(max_length=20, default=current_store, db_index=True)
+    product_id = models.CharField(max_length=50, db_index=True)
+    name = models.CharField(max_length=200)
+    available_stocks = models.PositiveIntegerField(default=0)
+    price_per_unit = models.FloatField(default=0.0)
+    tax_percentage = models.FloatField(default=0.0)
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"₹{self.denomination_value} x {self.count}"
\ No newline at end of file
+        return f"#{self.id} {self.product_id}"
+
+    @property
+    def sequence(self):
+        return self.id
+
+    @classmethod
+    def for_product(cls, product, deleted=False):
+        return cls(
+            store=product.store,
+            product_id=product.product_id,
+            name=product.name,
+            available_stocks=product.available_stocks,
+            price_per_unit=product.price_per_unit,
+            tax_percentage=product.tax_percentage,
+            deleted=deleted
+        )
+
+    @classmethod
+    def record(cls, product, deleted=False):
+        change = cls.for_product(product, deleted=deleted)
+        change.save(using=product._state.db)
+        return change
+
+    class Meta:
+        ordering = ['id']
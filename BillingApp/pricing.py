@@ -0,0 +1,88 @@
+import math
+
+from django.conf import settings
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; large carts fall back to the Python loop
+    np = None
+
+
+def vectorize_threshold():
+    """Cart size from which the NumPy path is used, or None to never pick it.
+
+    Off by default: building NumPy arrays from the per-line dicts costs more
+    than the arithmetic it saves (see ``manage.py benchmark_pricing``).
+    """
+    return getattr(settings, 'BILLING_PRICING_VECTORIZE_THRESHOLD', None)
+
+
+def _price_lines_python(items_data):
+    lines = []
+    total_without_tax = 0
+    total_tax = 0
+
+    for item in items_data:
+        item_total = item['unit_price'] * item['quantity']
+        item_tax = (item_total * item['tax_percentage']) / 100
+        lines.append({
+            'line_total': item_total,
+            'tax_amount': item_tax,
+            'total_price': item_total + item_tax
+        })
+        total_without_tax += item_total
+        total_tax += item_tax
+
+    return lines, total_without_tax, total_tax
+
+
+def _price_lines_numpy(items_data):
+    unit_price = np.array([item['unit_price'] for item in items_data], dtype=np.float64)
+    quantity = np.array([item['quantity'] for item in items_data], dtype=np.float64)
+    tax_percentage = np.array([item['tax_percentage'] for item in items_data], dtype=np.float64)
+
+    item_total = unit_price * quantity
+    item_tax = (item_total * tax_percentage) / 100
+    total_price = item_total + item_tax
+
+    lines = [
+        {'line_total': line_total, 'tax_amount': tax_amount, 'total_price': price}
+        for line_total, tax_amount, price in zip(item_total.tolist(), item_tax.tolist(), total_price.tolist())
+    ]
+    # cumsum adds left to right like the Python loop, so totals match it bit for bit
+    return lines, float(np.cumsum(item_total)[-1]), float(np.cumsum(item_tax)[-1])
+
+
+def bill_totals(total_without_tax, total_tax):
+    """Bill totals from the summed line amounts"""
+    net_amount = total_without_tax + total_tax
+    rounded_amount = math.ceil(net_amount)  # Round up to nearest rupee
+
+    return {
+        'total_without_tax': round(total_without_tax, 2),
+        'total_tax': round(total_tax, 2),
+        'net_amount': round(net_amount, 2),
+        'rounded_amount': rounded_amount
+    }
+
+
+def price_cart(items_data, vectorize=None):
+    """Price every line and the bill totals in a single pass.
+
+    Returns ``(lines, totals)`` where ``lines[i]`` holds the line total, tax
+    amount and total price for ``items_data[i]``. ``vectorize`` forces the
+    NumPy (True) or Python (False) path; by default it is picked by cart size
+    against ``BILLING_PRICING_VECTORIZE_THRESHOLD``.
+    """
+    if vectorize is None:
+        threshold = vectorize_threshold()
+        vectorize = np is not None and threshold is not None and len(items_data) >= threshold
+    if vectorize and np is None:
+        raise ImportError('NumPy is required for the vectorized pricing path')
+
+    if vectorize and items_data:
+        lines, total_without_tax, total_tax = _price_lines_numpy(items_data)
+    else:
+        lines, total_without_tax, total_tax = _price_lines_python(items_data)
+
+    return lines, bill_totals(total_without_tax, total_tax)
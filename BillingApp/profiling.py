@@ -0,0 +1,115 @@
+import cProfile
+import json
+import logging
+import random
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def profiling_settings():
+    """Read the BILLING_PROFILING_* settings with their defaults"""
+    return {
+        'enabled': getattr(settings, 'BILLING_PROFILING_ENABLED', False),
+        'budget_ms': getattr(settings, 'BILLING_PROFILING_BUDGET_MS', 1000),
+        'sample_rate': getattr(settings, 'BILLING_PROFILING_SAMPLE_RATE', 1.0),
+        'directory': Path(getattr(settings, 'BILLING_PROFILING_DIR', settings.BASE_DIR / 'profiles')),
+        'max_captures': getattr(settings, 'BILLING_PROFILING_MAX_CAPTURES', 100),
+    }
+
+
+class QueryRecorder:
+    """Database execute wrapper that records each query and its duration"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'duration_ms': (time.perf_counter() - started) * 1000,
+                'many': many
+            })
+
+
+def save_capture(directory, request, response, duration_ms, profiler, queries, max_captures):
+    """Write one capture (cProfile stats + query log) and rotate old ones out"""
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"{timezone.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+
+    if profiler is not None:
+        profiler.dump_stats(directory / f'{name}.prof')
+    with open(directory / f'{name}.json', 'w') as f:
+        json.dump({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 2),
+            'captured_at': timezone.now().isoformat(),
+            'profile': f'{name}.prof' if profiler is not None else None,
+            'queries': queries
+        }, f, indent=2)
+
+    captures = sorted(directory.glob('*.json'))
+    for old in captures[:max(0, len(captures) - max_captures)]:
+        old.unlink(missing_ok=True)
+        old.with_suffix('.prof').unlink(missing_ok=True)
+
+
+class SlowRequestProfilerMiddleware:
+    """Profile requests and keep captures for the ones slower than the budget.
+
+    Opt-in through ``BILLING_PROFILING_ENABLED``. A ``BILLING_PROFILING_SAMPLE_RATE``
+    fraction of requests runs under cProfile with its SQL recorded; those that
+    exceed ``BILLING_PROFILING_BUDGET_MS`` are written to ``BILLING_PROFILING_DIR``,
+    which keeps at most ``BILLING_PROFILING_MAX_CAPTURES`` captures.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = profiling_settings()
+        if not config['enabled'] or random.random() >= config['sample_rate']:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this thread
+            profiler = None
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                # Record queries on every store shard, not just the default database
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if duration_ms >= config['budget_ms']:
+            try:
+                save_capture(config['directory'], request, response, duration_ms,
+                             profiler, recorder.queries, config['max_captures'])
+            except OSError as e:
+                logger.warning(f"Could not save profile for {request.path}: {str(e)}")
+            else:
+                logger.info(f"Slow request {request.method} {request.path} took {duration_ms:.0f}ms; profile saved")
+        return response
@@ -0,0 +1,131 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+
+_current_store = contextvars.ContextVar('billing_current_store', default=None)
+
+
+def store_shards():
+    """Map of store code -> database alias, from BILLING_STORES"""
+    return getattr(settings, 'BILLING_STORES', {default_store(): 'default'})
+
+
+def default_store():
+    return getattr(settings, 'BILLING_DEFAULT_STORE', 'MAIN')
+
+
+def current_store():
+    """Store the current request or ``use_store`` block is working for"""
+    return _current_store.get() or default_store()
+
+
+def db_for_store(store):
+    try:
+        return store_shards()[store]
+    except KeyError:
+        raise ValueError(f'Unknown store {store!r}')
+
+
+@contextmanager
+def use_store(store):
+    """Route BillingApp queries inside the block to ``store``'s shard"""
+    db_for_store(store)
+    token = _current_store.set(store)
+    try:
+        yield store
+    finally:
+        _current_store.reset(token)
+
+
+def fan_out(func, stores=None):
+    """Run ``func(store)`` for every store concurrently, each routed to its own shard.
+
+    Returns ``{store: result}``. Used for chain-wide reports that have to read
+    every shard.
+    """
+    stores = list(stores or store_shards())
+
+    def run(store):
+        try:
+            with use_store(store):
+                return func(store)
+        finally:
+            # Worker threads open their own connections; don't leak them
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=len(stores) or 1) as executor:
+        return dict(zip(stores, executor.map(run, stores)))
+
+
+class StoreShardRouter:
+    """Send BillingApp models to the shard of the store they belong to.
+
+    Saved instances go to the shard they were loaded from (or their ``store``'s
+    shard when new); everything else follows ``current_store()``. Other apps
+    (auth, sessions, admin) stay on ``default``.
+    """
+
+    app_label = 'BillingApp'
+
+    def _db(self, model, instance=None):
+        if model._meta.app_label != self.app_label:
+            return None
+        if instance is not None:
+            if instance._state.db:
+                return instance._state.db
+            store = getattr(instance, 'store', None)
+            if store:
+                return db_for_store(store)
+        return db_for_store(current_store())
+
+    def db_for_read(self, model, **hints):
+        return self._db(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self._db(model, hints.get('instance'))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if self.app_label in (obj1._meta.app_label, obj2._meta.app_label):
+            return obj1._state.db == obj2._state.db
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == self.app_label:
+            return db in set(store_shards().values())
+        return db == 'default'
+
+
+class StoreMiddleware:
+    """Pick the store for the request.
+
+    Taken from the ``X-Store`` header, else a ``store`` query parameter (which
+    is remembered in the session), else the session, else
+    ``BILLING_DEFAULT_STORE``. Header-only terminals never touch the session.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        session = getattr(request, 'session', None)
+        header_store = request.headers.get('X-Store')
+        param_store = request.GET.get('store')
+        store = header_store or param_store
+        if store:
+            if store not in store_shards():
+                return JsonResponse({'error': f'Unknown store {store}'}, status=400)
+            # Only write the session when a cashier switches store with ?store=
+            if not header_store and session is not None and session.get('store') != store:
+                session['store'] = store
+        else:
+            store = session.get('store') if session is not None else None
+            if store not in store_shards():
+                store = default_store()
+
+        request.store = store
+        with use_store(store):
+            return self.get_response(request)
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Product, ProductChange
+
+@receiver(post_save, sender=Product)
+def record_product_change(sender, instance, raw=False, **kwargs):
+    """Append every saved product (admin edits, checkout stock updates) to the change feed"""
+    if not raw:
+        ProductChange.record(instance)
+
+@receiver(post_delete, sender=Product)
+def record_product_deletion(sender, instance, **kwargs):
+    ProductChange.record(instance, deleted=True)
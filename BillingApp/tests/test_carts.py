@@ -0,0 +1,137 @@
+import json
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from BillingApp import carts
+from BillingApp.models import Product, Denomination, Purchase
+
+class CartApiTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.pen = Product.objects.create(product_id='P1', name='Pen', available_stocks=10,
+                                          price_per_unit=100.0, tax_percentage=18.0)
+        self.ink = Product.objects.create(product_id='P2', name='Ink', available_stocks=3,
+                                          price_per_unit=50.0, tax_percentage=12.0)
+        for value in [500, 50, 20, 10, 5, 2, 1]:
+            Denomination.objects.create(value=value, count=10)
+        self.cart_id = self.client.post('/billing/api/carts/').json()['cart']['cart_id']
+
+    def call(self, method, path, data=None):
+        url = f'/billing/api/carts/{self.cart_id}/{path}'
+        if method == 'get':
+            return self.client.get(url)
+        return getattr(self.client, method)(url, json.dumps(data or {}), content_type='application/json')
+
+    def test_running_totals_follow_line_changes(self):
+        self.call('post', 'lines/', {'product_id': 'P1'})
+        cart = self.call('post', 'lines/', {'product_id': 'P1'}).json()['cart']
+        self.assertEqual(cart['lines'][0]['quantity'], 2)
+        self.assertEqual(cart['totals']['rounded_amount'], 236)
+
+        cart = self.call('post', 'lines/', {'product_id': 'P2', 'quantity': 2}).json()['cart']
+        self.assertEqual(cart['totals']['net_amount'], 348.0)
+
+        cart = self.call('put', 'lines/P1/', {'quantity': 1}).json()['cart']
+        self.assertEqual(cart['totals']['net_amount'], 230.0)
+
+        cart = self.call('delete', 'lines/P2/').json()['cart']
+        self.assertEqual([line['product_id'] for line in cart['lines']], ['P1'])
+        self.assertEqual(cart['totals'], {'total_without_tax': 100.0, 'total_tax': 18.0,
+                                          'net_amount': 118.0, 'rounded_amount': 118})
+
+    def test_stock_is_checked_per_line_change(self):
+        response = self.call('post', 'lines/', {'product_id': 'P2', 'quantity': 4})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Insufficient stock for Ink', response.json()['error'])
+        self.assertEqual(self.call('post', 'lines/', {'product_id': 'NOPE'}).status_code, 400)
+
+    def test_checkout_commits_cart_without_refetching_products(self):
+        self.call('post', 'lines/', {'product_id': 'P1', 'quantity': 2})
+        self.call('post', 'lines/', {'product_id': 'P2'})
+        response = self.call('post', 'checkout/', {'customer_email': 'a@example.com', 'cash_paid': 500})
+        self.assertTrue(response.json()['success'])
+
+        purchase = Purchase.objects.get()
+        self.assertEqual(purchase.rounded_amount, 292)
+        self.assertEqual(purchase.items.count(), 2)
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.available_stocks, 8)
+        # The cart is gone once it has been paid for
+        self.assertEqual(self.call('get', '').status_code, 404)
+
+    def test_checkout_rolls_back_when_stock_ran_out_meanwhile(self):
+        self.call('post', 'lines/', {'product_id': 'P1'})
+        self.call('post', 'lines/', {'product_id': 'P2', 'quantity': 3})
+        Product.objects.filter(pk=self.ink.pk).update(available_stocks=1)
+
+        response = self.call('post', 'checkout/', {'customer_email': 'a@example.com', 'cash_paid': 500})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Purchase.objects.exists())
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.available_stocks, 10)
+
+    def test_line_of_product_removed_from_catalog(self):
+        self.call('post', 'lines/', {'product_id': 'P1'})
+        self.call('post', 'lines/', {'product_id': 'P2'})
+        Product.objects.filter(pk=self.ink.pk).delete()
+
+        payment = {'customer_email': 'a@example.com', 'cash_paid': 500}
+        response = self.call('post', 'checkout/', payment)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Ink is no longer in the catalog')
+
+        cart = self.call('delete', 'lines/P2/').json()['cart']
+        self.assertEqual([line['product_id'] for line in cart['lines']], ['P1'])
+        self.assertTrue(self.call('post', 'checkout/', payment).json()['success'])
+        self.assertEqual(Purchase.objects.get().rounded_amount, 118)
+
+    def test_displayed_total_is_what_checkout_charges(self):
+        # Untaxed prices whose float sums land right on a whole rupee
+        for product_id, price in (('A', 0.2), ('B', 0.9), ('C', 0.1)):
+            Product.objects.create(product_id=product_id, name=product_id, available_stocks=10,
+                                   price_per_unit=price, tax_percentage=0.0)
+
+        # Remove and re-add lines; 0.2 + 0.9 - 0.2 + 0.1 as a running sum is 1.0000000000000002
+        self.call('post', 'lines/', {'product_id': 'A'})
+        self.call('post', 'lines/', {'product_id': 'B'})
+        self.call('delete', 'lines/A/')
+        self.call('post', 'lines/', {'product_id': 'C'})
+        self.call('post', 'lines/', {'product_id': 'A'})
+        self.call('delete', 'lines/A/')
+        displayed = self.call('get', '').json()['cart']['totals']['rounded_amount']
+
+        response = self.call('post', 'checkout/', {'customer_email': 'a@example.com', 'cash_paid': displayed})
+        self.assertTrue(response.json()['success'], response.json())
+        self.assertEqual(Purchase.objects.get().rounded_amount, displayed)
+
+    def test_checkout_rejects_malformed_payment(self):
+        self.call('post', 'lines/', {'product_id': 'P1'})
+        for body in ({'customer_email': 'a@example.com', 'cash_paid': 500, 'denominations': {'500': 'abc'}},
+                     {'customer_email': 'a@example.com', 'cash_paid': 500, 'denominations': 'oops'},
+                     {'customer_email': 'a@example.com', 'cash_paid': 'nan'},
+                     {'customer_email': 'a@example.com', 'cash_paid': 'inf'},
+                     {'customer_email': 'a@example.com', 'cash_paid': float('nan')},
+                     ['not', 'an', 'object']):
+            response = self.call('post', 'checkout/', body)
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.json()['success'])
+        self.assertFalse(Purchase.objects.exists())
+
+    def test_cart_is_checked_out_only_once(self):
+        self.call('post', 'lines/', {'product_id': 'P1'})
+        cart = carts.get_cart('MAIN', self.cart_id)
+        payment = {'customer_email': 'a@example.com', 'cash_paid': 118}
+        self.assertTrue(self.call('post', 'checkout/', payment).json()['success'])
+
+        # A request that loaded the cart before it was deleted still cannot commit it again
+        with mock.patch.object(carts, 'get_cart', return_value=cart):
+            response = self.call('post', 'checkout/', payment)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Purchase.objects.count(), 1)
+
+    def test_failed_checkout_can_be_retried(self):
+        self.call('post', 'lines/', {'product_id': 'P1'})
+        response = self.call('post', 'checkout/', {'customer_email': 'a@example.com', 'cash_paid': 100})
+        self.assertEqual(response.json()['error'], 'Insufficient payment')
+        response = self.call('post', 'checkout/', {'customer_email': 'a@example.com', 'cash_paid': 118})
+        self.assertTrue(response.json()['success'])
@@ -0,0 +1,56 @@
+import gzip
+import json
+from django.test import TestCase
+from BillingApp.models import Product, ProductChange
+
+class CatalogFeedTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(product_id='P1', name='Pen', available_stocks=10,
+                                              price_per_unit=10.0, tax_percentage=5.0)
+
+    def test_saves_and_deletes_are_sequenced(self):
+        first = ProductChange.objects.get()
+        self.product.price_per_unit = 12.0
+        self.product.save()
+        self.product.delete()
+
+        response = self.client.get('/billing/api/catalog/changes/', {'since': first.sequence})
+        data = response.json()
+        self.assertEqual([c['price'] for c in data['changes']], [12.0, 12.0])
+        self.assertEqual([c['deleted'] for c in data['changes']], [False, True])
+        self.assertEqual(data['next_since'], data['changes'][-1]['sequence'])
+        self.assertFalse(data['has_more'])
+
+    def test_changes_are_paged(self):
+        for stock in range(3):
+            self.product.available_stocks = stock
+            self.product.save()
+
+        data = self.client.get('/billing/api/catalog/changes/', {'since': 0, 'limit': 2}).json()
+        self.assertEqual(len(data['changes']), 2)
+        self.assertTrue(data['has_more'])
+        data = self.client.get('/billing/api/catalog/changes/', {'since': data['next_since']}).json()
+        self.assertEqual([c['available_stocks'] for c in data['changes']], [1, 2])
+
+    def test_invalid_since(self):
+        response = self.client.get('/billing/api/catalog/changes/', {'since': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_snapshot_is_compressed_and_cacheable(self):
+        # Responses under 200 bytes are not worth compressing
+        for n in range(2, 6):
+            Product.objects.create(product_id=f'P{n}', name=f'Item {n}', available_stocks=n,
+                                   price_per_unit=float(n), tax_percentage=12.0)
+        response = self.client.get('/billing/api/catalog/snapshot/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(data['sequence'], ProductChange.objects.last().sequence)
+        self.assertEqual(len(data['products']), 5)
+
+        response = self.client.get('/billing/api/catalog/snapshot/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        self.product.name = 'Blue Pen'
+        self.product.save()
+        response = self.client.get('/billing/api/catalog/snapshot/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,38 @@
+import io
+import random
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+from BillingApp.management.commands.loadtest import Command, percentile, build_cart
+from BillingApp.models import Product
+
+class LoadTestHelpersTest(SimpleTestCase):
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_build_cart_pays_at_least_the_rounded_bill(self):
+        catalog = [
+            {'product_id': 'P1', 'price': 99.5, 'tax_percentage': 18.0},
+            {'product_id': 'P2', 'price': 10.0, 'tax_percentage': 12.0},
+        ]
+        rng = random.Random(1)
+        for _ in range(50):
+            cart, cash_paid = build_cart(catalog, rng, max_lines=2)
+            net = sum(p['price'] * q * (1 + p['tax_percentage'] / 100) for p, q in cart)
+            self.assertTrue(1 <= len(cart) <= 2)
+            self.assertGreaterEqual(cash_paid, net)
+
+
+class InvariantCheckTest(TestCase):
+    def test_mismatch_fails_the_command(self):
+        Product.objects.create(product_id='P1', name='Pen', available_stocks=10,
+                               price_per_unit=10.0, tax_percentage=5.0)
+        command = Command(stdout=io.StringIO())
+        before = command.snapshot()
+        # Stock moves without a purchase to account for it
+        Product.objects.update(available_stocks=9)
+        with self.assertRaises(CommandError):
+            command.check_invariants(before, command.snapshot(), [])
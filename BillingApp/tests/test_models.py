@@ -11,4 +11,16 @@ class ProductModelTest(TestCase):
             tax_percentage=18.0
         )
         self.assertEqual(product.product_id, "TEST001")
-        self.assertEqual(str(product), "Test Product (TEST001)")
\ No newline at end of file
+        self.assertEqual(str(product), "Test Product (TEST001)")
+
+class PurchaseModelTest(TestCase):
+    def test_balance_denominations_from_packed_counts(self):
+        customer = Customer.objects.create(email="a@example.com")
+        purchase = Purchase.objects.create(
+            customer=customer,
+            balance_denomination_counts={"10": 1, "500": 2, "2": 0}
+        )
+        self.assertEqual(purchase.balance_denominations, [
+            {'denomination_value': 500, 'count': 2},
+            {'denomination_value': 10, 'count': 1},
+        ])
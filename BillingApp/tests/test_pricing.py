@@ -0,0 +1,44 @@
+import random
+from unittest import mock, skipIf
+from django.test import SimpleTestCase, override_settings
+from BillingApp import pricing
+from BillingApp.utils import calculate_bill_totals
+
+class PriceCartTest(SimpleTestCase):
+    def test_lines_and_totals(self):
+        lines, totals = pricing.price_cart([
+            {'unit_price': 100.0, 'quantity': 2, 'tax_percentage': 18.0},
+            {'unit_price': 50.5, 'quantity': 1, 'tax_percentage': 12.0},
+        ])
+        self.assertAlmostEqual(lines[0]['tax_amount'], 36.0)
+        self.assertAlmostEqual(lines[0]['total_price'], 236.0)
+        self.assertAlmostEqual(lines[1]['total_price'], 56.56)
+        self.assertEqual(totals, {
+            'total_without_tax': 250.5,
+            'total_tax': 42.06,
+            'net_amount': 292.56,
+            'rounded_amount': 293
+        })
+
+    def test_calculate_bill_totals_uses_engine(self):
+        items = [{'unit_price': 10.0, 'quantity': 3, 'tax_percentage': 5.0}]
+        self.assertEqual(calculate_bill_totals(items), pricing.price_cart(items)[1])
+
+    @skipIf(pricing.np is None, 'NumPy is not installed')
+    def test_vectorized_path_matches_python_path(self):
+        rng = random.Random(7)
+        items = [
+            {'unit_price': round(rng.uniform(1, 999), 2), 'quantity': rng.randint(1, 9),
+             'tax_percentage': rng.choice([0.0, 5.0, 12.0, 18.0])}
+            for _ in range(250)
+        ]
+        self.assertEqual(pricing.price_cart(items, vectorize=False), pricing.price_cart(items, vectorize=True))
+
+    @skipIf(pricing.np is None, 'NumPy is not installed')
+    def test_threshold_selects_vectorized_path(self):
+        items = [{'unit_price': 1.0, 'quantity': 1, 'tax_percentage': 0.0}] * 3
+        with override_settings(BILLING_PRICING_VECTORIZE_THRESHOLD=3), \
+                mock.patch.object(pricing, '_price_lines_numpy', wraps=pricing._price_lines_numpy) as numpy_path:
+            pricing.price_cart(items)
+            pricing.price_cart(items[:2])
+        self.assertEqual(numpy_path.call_count, 1)
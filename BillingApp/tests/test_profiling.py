@@ -0,0 +1,43 @@
+import json
+import tempfile
+from pathlib import Path
+from django.test import TestCase, override_settings
+from BillingApp.models import Product
+
+class SlowRequestProfilerMiddlewareTest(TestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        Product.objects.create(product_id='P1', name='Pen', available_stocks=5,
+                               price_per_unit=10.0, tax_percentage=5.0)
+
+    def captures(self):
+        return sorted(self.directory.glob('*.json'))
+
+    def test_disabled_by_default(self):
+        with override_settings(BILLING_PROFILING_DIR=self.directory):
+            self.client.get('/billing/')
+        self.assertEqual(self.captures(), [])
+
+    def test_captures_requests_over_budget_with_queries(self):
+        with override_settings(BILLING_PROFILING_ENABLED=True, BILLING_PROFILING_BUDGET_MS=0,
+                               BILLING_PROFILING_DIR=self.directory):
+            self.client.get('/billing/')
+        [capture] = self.captures()
+        data = json.loads(capture.read_text())
+        self.assertEqual(data['path'], '/billing/')
+        self.assertTrue(any('BillingApp_product' in q['sql'] for q in data['queries']))
+        self.assertTrue((self.directory / data['profile']).exists())
+
+    def test_skips_requests_within_budget(self):
+        with override_settings(BILLING_PROFILING_ENABLED=True, BILLING_PROFILING_BUDGET_MS=60000,
+                               BILLING_PROFILING_DIR=self.directory):
+            self.client.get('/billing/')
+        self.assertEqual(self.captures(), [])
+
+    def test_rotates_old_captures(self):
+        with override_settings(BILLING_PROFILING_ENABLED=True, BILLING_PROFILING_BUDGET_MS=0,
+                               BILLING_PROFILING_DIR=self.directory, BILLING_PROFILING_MAX_CAPTURES=2):
+            for _ in range(4):
+                self.client.get('/billing/')
+        self.assertEqual(len(self.captures()), 2)
+        self.assertEqual(len(list(self.directory.glob('*.prof'))), 2)
@@ -0,0 +1,88 @@
+from django.contrib.sessions.models import Session
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from BillingApp.models import Product, Denomination, Purchase, ProductChange
+from BillingApp.checkout import complete_checkout
+from BillingApp.sharding import use_store, current_store, fan_out
+
+class StoreDataMixin:
+    databases = {'default', 'store_branch'}
+
+    def setUp(self):
+        for store in ('MAIN', 'BRANCH'):
+            with use_store(store):
+                Product.objects.create(product_id='P1', name=f'Pen {store}', available_stocks=10,
+                                       price_per_unit=100.0, tax_percentage=18.0)
+                for value in [500, 50, 20, 10, 5, 2, 1]:
+                    Denomination.objects.create(value=value, count=10)
+
+class StoreShardingTest(StoreDataMixin, TestCase):
+    def test_each_store_lives_in_its_own_database(self):
+        self.assertEqual(Product.objects.using('default').get().store, 'MAIN')
+        self.assertEqual(Product.objects.using('store_branch').get().store, 'BRANCH')
+        self.assertEqual(ProductChange.objects.using('store_branch').get().name, 'Pen BRANCH')
+
+    def test_checkout_routes_to_store_shard(self):
+        response = self.client.post('/billing/?store=BRANCH', {
+            'customer_email': 'a@example.com', 'product_id[]': ['P1'], 'quantity[]': ['2'], 'cash_paid': '236'
+        })
+        self.assertTrue(response.json()['success'])
+
+        self.assertFalse(Purchase.objects.using('default').exists())
+        self.assertEqual(Purchase.objects.using('store_branch').get().store, 'BRANCH')
+        self.assertEqual(Product.objects.using('store_branch').get().available_stocks, 8)
+        self.assertEqual(Product.objects.using('default').get().available_stocks, 10)
+
+        # The store is remembered in the session for later pages
+        response = self.client.get('/billing/history/')
+        self.assertEqual(len(response.context['page_obj']), 1)
+        response = self.client.get('/billing/history/', {'store': 'MAIN'})
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_complete_checkout_stays_on_its_store_shard(self):
+        product = Product.objects.using('store_branch').get()
+        item = {'product_pk': product.pk, 'name': product.name, 'quantity': 1,
+                'unit_price': product.price_per_unit, 'tax_percentage': product.tax_percentage}
+        # Called while MAIN is the active store
+        purchase = complete_checkout('BRANCH', 'a@example.com', [item], 118, {})
+
+        self.assertEqual(purchase._state.db, 'store_branch')
+        self.assertEqual(purchase.items.get().product_id, product.pk)
+        self.assertEqual(Product.objects.using('store_branch').get().available_stocks, 9)
+        self.assertEqual(Product.objects.using('default').get().available_stocks, 10)
+        self.assertFalse(Purchase.objects.using('default').exists())
+
+    def test_header_store_does_not_write_sessions(self):
+        for _ in range(3):
+            self.client.cookies.clear()
+            response = self.client.get('/billing/api/catalog/changes/', HTTP_X_STORE='BRANCH')
+            self.assertEqual(response.json()['store'], 'BRANCH')
+        self.assertFalse(Session.objects.exists())
+
+    def test_query_store_is_remembered_once(self):
+        self.client.get('/billing/history/', {'store': 'BRANCH'})
+        session = Session.objects.get()
+        with CaptureQueriesContext(connections['default']) as queries:
+            self.client.get('/billing/api/catalog/changes/', {'store': 'BRANCH'})
+        self.assertEqual([q['sql'] for q in queries if not q['sql'].startswith('SELECT')], [])
+        self.assertEqual(Session.objects.get().session_key, session.session_key)
+
+    def test_unknown_store(self):
+        response = self.client.get('/billing/', HTTP_X_STORE='NOWHERE')
+        self.assertEqual(response.status_code, 400)
+
+# Fan-out reads every shard from worker threads, so the data has to be committed
+class ChainReportTest(StoreDataMixin, TransactionTestCase):
+    def test_fan_out_and_chain_report(self):
+        for store, headers in (('MAIN', {}), ('BRANCH', {'HTTP_X_STORE': 'BRANCH'})):
+            self.client.post('/billing/', {
+                'customer_email': 'a@example.com', 'product_id[]': ['P1'], 'quantity[]': ['1'], 'cash_paid': '118'
+            }, **headers)
+
+        self.assertEqual(fan_out(lambda store: current_store()), {'MAIN': 'MAIN', 'BRANCH': 'BRANCH'})
+        data = self.client.get('/billing/reports/chain/').json()
+        self.assertEqual(data['stores']['BRANCH']['purchases'], 1)
+        self.assertEqual(data['stores']['BRANCH']['database'], 'store_branch')
+        self.assertEqual(data['chain']['purchases'], 2)
+        self.assertEqual(data['chain']['net_amount'], 236.0)
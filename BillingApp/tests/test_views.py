@@ -0,0 +1,38 @@
+from django.test import TestCase
+from BillingApp.models import Product, Denomination, Purchase
+
+class CheckoutTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(product_id='P1', name='Pen', available_stocks=10,
+                                              price_per_unit=100.0, tax_percentage=18.0)
+        for value in [500, 50, 20, 10, 5, 2, 1]:
+            Denomination.objects.create(value=value, count=10)
+
+    def checkout(self, **data):
+        payload = {'customer_email': 'a@example.com', 'product_id[]': ['P1'], 'quantity[]': ['2'], 'cash_paid': '500'}
+        payload.update(data)
+        return self.client.post('/billing/', payload)
+
+    def test_checkout_records_purchase_and_change(self):
+        response = self.checkout()
+        self.assertTrue(response.json()['success'])
+
+        purchase = Purchase.objects.get()
+        self.assertEqual(purchase.rounded_amount, 236)
+        self.assertEqual(purchase.balance_denomination_counts, {'50': 5, '10': 1, '2': 2})
+        self.assertEqual(purchase.items.get().total_price, 236.0)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.available_stocks, 8)
+        self.assertEqual(Denomination.objects.get(value=50).count, 5)
+
+    def test_insufficient_stock(self):
+        response = self.checkout(**{'quantity[]': ['11']})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Purchase.objects.exists())
+
+    def test_bill_detail_renders_balance_denominations(self):
+        purchase_id = self.checkout().json()['purchase_id']
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/billing/bill/{purchase_id}/')
+        self.assertContains(response, '₹50:')
+        self.assertNotContains(response, 'No balance to return')
@@ -8,4 +8,12 @@ urlpatterns = [
     path('bill/<uuid:purchase_id>/', views.bill_detail, name='bill_detail'),
     path('history/', views.purchase_history, name='purchase_history'),
     path('api/product-info/', views.get_product_info, name='get_product_info'),
+    path('api/catalog/changes/', views.catalog_changes, name='catalog_changes'),
+    path('api/catalog/snapshot/', views.catalog_snapshot, name='catalog_snapshot'),
+    path('reports/chain/', views.chain_sales_report, name='chain_sales_report'),
+    path('api/carts/', views.cart_create, name='cart_create'),
+    path('api/carts/<uuid:cart_id>/', views.cart_detail, name='cart_detail'),
+    path('api/carts/<uuid:cart_id>/lines/', views.cart_add_line, name='cart_add_line'),
+    path('api/carts/<uuid:cart_id>/lines/<str:product_id>/', views.cart_line, name='cart_line'),
+    path('api/carts/<uuid:cart_id>/checkout/', views.cart_checkout, name='cart_checkout'),
 ]
\ No newline at end of file
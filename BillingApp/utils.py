@@ -1,8 +1,9 @@
 from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
-from .models import Denomination, BalanceDenomination
-import math
+from .models import Denomination
+from .pricing import price_cart
+from .sharding import current_store
 
 def calculate_balance_denominations(balance_amount):
     """Calculate the minimum denominations needed for balance"""
@@ -10,7 +11,7 @@ def calculate_balance_denominations(balance_amount):
     available_denominations = {}
     
     # Get available denominations from database
-    for denom in Denomination.objects.all():
+    for denom in Denomination.objects.filter(store=current_store()):
         available_denominations[denom.value] = denom.count
     
     balance_denominations = {}
@@ -31,14 +32,14 @@ def update_denomination_stock(denominations_used, denominations_received):
     """Update denomination stock after a transaction"""
     # Subtract used denominations
     for value, count in denominations_used.items():
-        denom, created = Denomination.objects.get_or_create(value=value, defaults={'count': 0})
+        denom, created = Denomination.objects.get_or_create(store=current_store(), value=value, defaults={'count': 0})
         denom.count = max(0, denom.count - count)
         denom.save()
     
     # Add received denominations
     for value, count in denominations_received.items():
         if count > 0:
-            denom, created = Denomination.objects.get_or_create(value=value, defaults={'count': 0})
+            denom, created = Denomination.objects.get_or_create(store=current_store(), value=value, defaults={'count': 0})
             denom.count += count
             denom.save()
 
@@ -62,21 +63,4 @@ def send_invoice_email(purchase):
 
 def calculate_bill_totals(items_data):
     """Calculate bill totals from items data"""
-    total_without_tax = 0
-    total_tax = 0
-    
-    for item in items_data:
-        item_total = item['unit_price'] * item['quantity']
-        item_tax = (item_total * item['tax_percentage']) / 100
-        total_without_tax += item_total
-        total_tax += item_tax
-    
-    net_amount = total_without_tax + total_tax
-    rounded_amount = math.ceil(net_amount)  # Round up to nearest rupee
-    
-    return {
-        'total_without_tax': round(total_without_tax, 2),
-        'total_tax': round(total_tax, 2),
-        'net_amount': round(net_amount, 2),
-        'rounded_amount': rounded_amount
-    }
\ No newline at end of file
+    return price_cart(items_data)[1]
\ No newline at end of file
@@ -1,13 +1,20 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db import transaction
-from .models import Product, Customer, Purchase, PurchaseItem, Denomination, BalanceDenomination
-from .utils import calculate_balance_denominations, update_denomination_stock, send_invoice_email, calculate_bill_totals
+from django.db.models import Count, Max, Sum
+from django.utils.dateparse import parse_date
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_GET, require_http_methods, require_POST
+from .models import Product, Purchase, Denomination, ProductChange
+from .checkout import CheckoutError, complete_checkout
+from . import carts
+from .sharding import fan_out, store_shards
 import json
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
@@ -17,17 +24,18 @@ def billing_form(request):
         return process_billing_form(request)
     
     # Get initial denominations
-    denominations = Denomination.objects.all().order_by('-value')
+    denominations = Denomination.objects.filter(store=request.store).order_by('-value')
     if not denominations.exists():
         # Create default denominations
         default_denominations = [500, 50, 20, 10, 5, 2, 1]
         for value in default_denominations:
-            Denomination.objects.create(value=value, count=10)
-        denominations = Denomination.objects.all().order_by('-value')
+            Denomination.objects.create(store=request.store, value=value, count=10)
+        denominations = Denomination.objects.filter(store=request.store).order_by('-value')
     
     context = {
         'denominations': denominations,
-        'products': Product.objects.all()
+        'products': Product.objects.filter(store=request.store),
+        'store': request.store
     }
     return render(request, 'billing/billing_form.html', context)
 
@@ -71,7 +79,7 @@ def process_billing_form(request):
         validated_items = []
         for item in items_data:
             try:
-                product = Product.objects.get(product_id=item['product_id'])
+                product = Product.objects.get(store=request.store, product_id=item['product_id'])
                 quantity = int(item['quantity'])
                 
                 if quantity <= 0:
@@ -85,7 +93,8 @@ def process_billing_form(request):
                     }, status=400)
                 
                 validated_items.append({
-                    'product': product,
+                    'product_pk': product.pk,
+                    'name': product.name,
                     'quantity': quantity,
                     'unit_price': product.price_per_unit,
                     'tax_percentage': product.tax_percentage
@@ -95,90 +104,10 @@ def process_billing_form(request):
             except (ValueError, KeyError) as e:
                 return JsonResponse({'error': f'Invalid item data: {str(e)}'}, status=400)
         
-        # Calculate bill totals
-        totals = calculate_bill_totals(validated_items)
-        balance_amount = cash_paid - totals['rounded_amount']
-        
-        if balance_amount < 0:
-            return JsonResponse({'error': 'Insufficient payment'}, status=400)
-        
-        # Calculate balance denominations only if there's a balance
-        balance_denominations = {}
-        remaining = 0
-        if balance_amount > 0:
-            balance_denominations, remaining = calculate_balance_denominations(balance_amount)
-            
-            if remaining > 0:
-                return JsonResponse({
-                    'error': f'Cannot provide exact change. Short by ₹{remaining}'
-                }, status=400)
-        
-        # Process the transaction
-        with transaction.atomic():
-            # Check if customer already exists by email (case-insensitive match)
-            customer = Customer.objects.filter(email__iexact=customer_email).first()
-            
-            if not customer:
-                # Create new customer
-                customer = Customer.objects.create(
-                    email=customer_email
-                )
-            
-            # Create purchase
-            purchase = Purchase.objects.create(
-                customer=customer,
-                total_amount=totals['total_without_tax'],
-                tax_amount=totals['total_tax'],
-                net_amount=totals['net_amount'],
-                rounded_amount=totals['rounded_amount'],
-                cash_paid=cash_paid,
-                balance_amount=balance_amount
-            )
-            
-            # Create purchase items and update stock
-            for item in validated_items:
-                product = item['product']
-                quantity = item['quantity']
-                
-                item_total = item['unit_price'] * quantity
-                item_tax = (item_total * item['tax_percentage']) / 100
-                
-                PurchaseItem.objects.create(
-                    purchase=purchase,
-                    product=product,
-                    quantity=quantity,
-                    unit_price=item['unit_price'],
-                    tax_percentage=item['tax_percentage'],
-                    tax_amount=item_tax,
-                    total_price=item_total + item_tax
-                )
-                
-                # Update product stock
-                product.available_stocks -= quantity
-                product.save()
-            
-            # Save balance denominations only if there are any
-            if balance_denominations:
-                for value, count in balance_denominations.items():
-                    if count > 0:
-                        BalanceDenomination.objects.create(
-                            purchase=purchase,
-                            denomination_value=value,
-                            count=count
-                        )
-                
-                # Update denomination stock
-                received_denominations = {
-                    int(k): int(v) for k, v in denominations_received.items() 
-                    if int(v) > 0
-                }
-                update_denomination_stock(balance_denominations, received_denominations)
-            
-            # Send invoice email (asynchronously in production)
-            try:
-                send_invoice_email(purchase)
-            except Exception as e:
-                logger.warning(f"Failed to send email for purchase {purchase.purchase_id}: {str(e)}")
+        try:
+            purchase = complete_checkout(request.store, customer_email, validated_items, cash_paid, denominations_received)
+        except CheckoutError as e:
+            return JsonResponse({'error': str(e)}, status=400)
         
         return JsonResponse({
             'success': True,
@@ -194,18 +123,18 @@ def process_billing_form(request):
 
 def bill_detail(request, purchase_id):
     """Display bill detail page"""
-    purchase = get_object_or_404(Purchase, purchase_id=purchase_id)
+    purchase = get_object_or_404(Purchase.objects.select_related('customer'), store=request.store, purchase_id=purchase_id)
     context = {
         'purchase': purchase,
-        'items': purchase.items.all(),
-        'balance_denominations': purchase.balance_denominations.all()
+        'items': purchase.items.select_related('product'),
+        'balance_denominations': purchase.balance_denominations
     }
     return render(request, 'billing/bill_detail.html', context)
 
 def purchase_history(request):
     """Display purchase history"""
     email = request.GET.get('email', '')
-    purchases = Purchase.objects.all().order_by('-created_at')
+    purchases = Purchase.objects.filter(store=request.store).order_by('-created_at')
     
     if email:
         purchases = purchases.filter(customer__email__icontains=email)
@@ -231,7 +160,7 @@ def get_product_info(request):
             if not product_id:
                 return JsonResponse({'success': False, 'error': 'Product ID is required'})
             
-            product = Product.objects.get(product_id=product_id)
+            product = Product.objects.get(store=request.store, product_id=product_id)
             return JsonResponse({
                 'success': True,
                 'product': {
@@ -249,4 +178,242 @@ def get_product_info(request):
             logger.error(f"Error in get_product_info: {str(e)}")
             return JsonResponse({'success': False, 'error': 'Internal server error'})
     
-    return JsonResponse({'success': False, 'error': 'Invalid request method'})
\ No newline at end of file
+    return JsonResponse({'success': False, 'error': 'Invalid request method'})
+
+
+CATALOG_CHANGES_MAX_LIMIT = 1000
+
+def _latest_catalog_sequence(store):
+    return ProductChange.objects.filter(store=store).aggregate(latest=Max('id'))['latest'] or 0
+
+def _catalog_etag(request):
+    return f'catalog-{request.store}-{_latest_catalog_sequence(request.store)}'
+
+@require_GET
+def catalog_changes(request):
+    """Catalog change feed: product updates with a sequence greater than ``since``"""
+    try:
+        since = int(request.GET.get('since', 0))
+        limit = min(int(request.GET.get('limit', CATALOG_CHANGES_MAX_LIMIT)), CATALOG_CHANGES_MAX_LIMIT)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'since and limit must be integers'}, status=400)
+
+    if limit <= 0:
+        return JsonResponse({'success': False, 'error': 'limit must be greater than 0'}, status=400)
+
+    # Fetch one extra row to know whether the client has to keep paging
+    changes = list(ProductChange.objects.filter(store=request.store, id__gt=since).order_by('id')[:limit + 1])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    return JsonResponse({
+        'success': True,
+        'store': request.store,
+        'changes': [
+            {
+                'sequence': change.sequence,
+                'product_id': change.product_id,
+                'deleted': change.deleted,
+                'name': change.name,
+                'price': change.price_per_unit,
+                'tax_percentage': change.tax_percentage,
+                'available_stocks': change.available_stocks
+            }
+            for change in changes
+        ],
+        'next_since': changes[-1].sequence if changes else since,
+        'has_more': has_more
+    })
+
+@require_GET
+@gzip_page
+@condition(etag_func=_catalog_etag)
+def catalog_snapshot(request):
+    """Full catalog for POS-side caches, gzip-compressed and tagged with the feed sequence"""
+    # Read the sequence first: a change landing in between is replayed by the feed
+    sequence = _latest_catalog_sequence(request.store)
+    products = Product.objects.filter(store=request.store).values_list('product_id', 'name', 'price_per_unit', 'tax_percentage', 'available_stocks')
+
+    return JsonResponse({
+        'success': True,
+        'store': request.store,
+        'sequence': sequence,
+        'products': [
+            {
+                'product_id': product_id,
+                'name': name,
+                'price': price,
+                'tax_percentage': tax_percentage,
+                'available_stocks': available_stocks
+            }
+            for product_id, name, price, tax_percentage, available_stocks in products
+        ]
+    })
+
+@require_GET
+def chain_sales_report(request):
+    """Chain-wide sales summary, fanned out across every store's shard"""
+    dates = {}
+    for key in ('date_from', 'date_to'):
+        if request.GET.get(key):
+            try:
+                dates[key] = parse_date(request.GET[key])
+            except ValueError:
+                dates[key] = None
+            if dates[key] is None:
+                return JsonResponse({'success': False, 'error': f'{key} must be YYYY-MM-DD'}, status=400)
+
+    def store_summary(store):
+        purchases = Purchase.objects.filter(store=store)
+        if 'date_from' in dates:
+            purchases = purchases.filter(created_at__date__gte=dates['date_from'])
+        if 'date_to' in dates:
+            purchases = purchases.filter(created_at__date__lte=dates['date_to'])
+        summary = purchases.aggregate(
+            purchases=Count('id'),
+            total_amount=Sum('total_amount'),
+            tax_amount=Sum('tax_amount'),
+            net_amount=Sum('net_amount')
+        )
+        return {key: value or 0 for key, value in summary.items()}
+
+    stores = fan_out(store_summary)
+    chain = {
+        key: sum(summary[key] for summary in stores.values())
+        for key in ('purchases', 'total_amount', 'tax_amount', 'net_amount')
+    }
+    return JsonResponse({
+        'success': True,
+        'stores': {store: {**summary, 'database': store_shards()[store]} for store, summary in stores.items()},
+        'chain': {key: round(value, 2) for key, value in chain.items()}
+    })
+
+CART_NOT_FOUND = {'success': False, 'error': 'Cart not found or expired'}
+
+def _cart_response(cart, status=200):
+    return JsonResponse({'success': True, 'cart': carts.cart_payload(cart)}, status=status)
+
+def _set_cart_line(request, cart, product_id, quantity_for):
+    """Apply one line change: fetch just this product, stock-check and re-price the line"""
+    try:
+        product = Product.objects.get(store=request.store, product_id=product_id)
+        carts.set_line_quantity(cart, product, quantity_for(carts.line_quantity(cart, product_id)))
+    except Product.DoesNotExist:
+        return JsonResponse({'success': False, 'error': f'Product {product_id} not found'}, status=400)
+    except carts.CartError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    carts.save_cart(cart)
+    return _cart_response(cart)
+
+@require_POST
+def cart_create(request):
+    """Start a server-side cart for the current store"""
+    return _cart_response(carts.create_cart(request.store), status=201)
+
+@require_http_methods(['GET', 'DELETE'])
+def cart_detail(request, cart_id):
+    """Current lines and running totals of a cart, or abandon it with DELETE"""
+    cart = carts.get_cart(request.store, cart_id)
+    if cart is None:
+        return JsonResponse(CART_NOT_FOUND, status=404)
+    if request.method == 'DELETE':
+        carts.delete_cart(cart)
+        return JsonResponse({'success': True})
+    return _cart_response(cart)
+
+@require_POST
+def cart_add_line(request, cart_id):
+    """Scan a product into the cart, adding to its quantity if already there"""
+    cart = carts.get_cart(request.store, cart_id)
+    if cart is None:
+        return JsonResponse(CART_NOT_FOUND, status=404)
+    try:
+        data = json.loads(request.body)
+        product_id = data['product_id']
+        quantity = int(data.get('quantity', 1))
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON data'}, status=400)
+    except (KeyError, TypeError, ValueError) as e:
+        return JsonResponse({'success': False, 'error': f'Invalid item data: {str(e)}'}, status=400)
+
+    if quantity <= 0:
+        return JsonResponse({'success': False, 'error': 'Quantity must be greater than 0'}, status=400)
+    return _set_cart_line(request, cart, product_id, lambda current: current + quantity)
+
+@require_http_methods(['PUT', 'DELETE'])
+def cart_line(request, cart_id, product_id):
+    """Set a line's quantity with PUT, or remove the line with DELETE"""
+    cart = carts.get_cart(request.store, cart_id)
+    if cart is None:
+        return JsonResponse(CART_NOT_FOUND, status=404)
+    if request.method == 'DELETE':
+        # No product lookup: a line must stay removable after its product left the catalog
+        if cart['lines'].pop(product_id, None) is None:
+            return JsonResponse({'success': False, 'error': f'Product {product_id} is not in the cart'}, status=400)
+        carts.save_cart(cart)
+        return _cart_response(cart)
+
+    try:
+        quantity = int(json.loads(request.body)['quantity'])
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON data'}, status=400)
+    except (KeyError, TypeError, ValueError) as e:
+        return JsonResponse({'success': False, 'error': f'Invalid item data: {str(e)}'}, status=400)
+
+    return _set_cart_line(request, cart, product_id, lambda current: quantity)
+
+@require_POST
+def cart_checkout(request, cart_id):
+    """Commit an already validated cart as a purchase"""
+    cart = carts.get_cart(request.store, cart_id)
+    if cart is None:
+        return JsonResponse(CART_NOT_FOUND, status=404)
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON data'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'success': False, 'error': 'Invalid JSON data'}, status=400)
+
+    try:
+        customer_email = data.get('customer_email')
+        cash_paid = float(data.get('cash_paid', 0))
+        if not math.isfinite(cash_paid):
+            raise ValueError('cash_paid must be a finite amount')
+        denominations = data.get('denominations') or {}
+        if not isinstance(denominations, dict):
+            raise TypeError('denominations must be an object of value: count')
+        denominations_received = {int(value): int(count) for value, count in denominations.items()}
+        if any(value <= 0 or count < 0 for value, count in denominations_received.items()):
+            raise ValueError('denomination values must be positive and counts not negative')
+    except (TypeError, ValueError) as e:
+        return JsonResponse({'success': False, 'error': f'Invalid payment data: {str(e)}'}, status=400)
+
+    if not customer_email:
+        return JsonResponse({'success': False, 'error': 'Customer email is required'}, status=400)
+
+    if not cart['lines']:
+        return JsonResponse({'success': False, 'error': 'At least one item is required'}, status=400)
+
+    if cash_paid <= 0:
+        return JsonResponse({'success': False, 'error': 'Cash paid must be greater than 0'}, status=400)
+
+    if not carts.claim_checkout(cart):
+        return JsonResponse({'success': False, 'error': 'Cart is already being checked out'}, status=409)
+
+    try:
+        purchase = complete_checkout(request.store, customer_email, carts.cart_items(cart), cash_paid, denominations_received)
+    except CheckoutError as e:
+        carts.release_checkout(cart)
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except Exception:
+        carts.release_checkout(cart)
+        raise
+
+    carts.delete_cart(cart)
+    return JsonResponse({
+        'success': True,
+        'purchase_id': str(purchase.purchase_id),
+        'redirect_url': reverse('BillingApp:bill_detail', args=[purchase.purchase_id])
+    })
@@ -41,8 +41,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'BillingApp.profiling.SlowRequestProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'BillingApp.sharding.StoreMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -78,8 +80,24 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # One database per store shard; separate SQLite files stand in locally.
+    # Create the schema with `python manage.py migrate --database=store_branch`.
+    'store_branch': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'store_branch.sqlite3',
+    },
+}
+
+DATABASE_ROUTERS = ['BillingApp.sharding.StoreShardRouter']
+
+# Store code -> database alias. Requests pick a store with the X-Store header
+# or ?store=<code> (remembered in the session); otherwise the default is used.
+BILLING_STORES = {
+    'MAIN': 'default',
+    'BRANCH': 'store_branch',
 }
+BILLING_DEFAULT_STORE = 'MAIN'
 
 
 # Password validation
@@ -125,4 +143,20 @@ STATICFILES_DIRS = [
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
\ No newline at end of file
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Carts with at least this many lines are priced with NumPy (if installed).
+# None keeps every cart on the pure-Python path.
+BILLING_PRICING_VECTORIZE_THRESHOLD = None
+
+# Opt-in slow request profiling: a SAMPLE_RATE fraction of requests runs under
+# cProfile, and those slower than BUDGET_MS are saved (with their SQL) to DIR.
+# Summarize captures with `python manage.py profile_report`.
+BILLING_PROFILING_ENABLED = False
+BILLING_PROFILING_BUDGET_MS = 1000
+BILLING_PROFILING_SAMPLE_RATE = 1.0
+BILLING_PROFILING_DIR = BASE_DIR / 'profiles'
+BILLING_PROFILING_MAX_CAPTURES = 100
+
+# Server-side carts live in the default cache for this many seconds. LocMemCache
+# is per process, so use a shared cache (e.g. Redis) when running several workers.
+BILLING_CART_TTL = 4 * 60 * 60